@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 import logging
 import sys
 import time
+from collections.abc import Awaitable, Callable
 from contextlib import asynccontextmanager
+from typing import Any
 
 import uvicorn
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI
+from fastapi.responses import Response
+from pydantic import TypeAdapter
 
 from . import __version__
 from .config import settings
@@ -16,7 +21,6 @@ from .dtos import (
     STATUS_OK,
     HealthResponse,
     IndexResponse,
-    ProxyRequest,
     V1Request,
     V1Response,
 )
@@ -25,58 +29,98 @@ from .solver import resolve_challenge
 
 log = logging.getLogger(__name__)
 
+# Keep shutdown well under the usual SIGKILL grace period of process managers
+# (e.g. Docker / Kubernetes default to 10-30s).
+SHUTDOWN_TIMEOUT_S = 8.0
+
+
+# Bound by the lifespan handler; read directly by /v1 instead of going through
+# the Request object on every call.
+_sessions: SessionsStorage | None = None
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.sessions = SessionsStorage()
+    global _sessions
+    _sessions = app.state.sessions = SessionsStorage(
+        warm_browsers=settings.warm_browsers,
+        shared_browser=settings.shared_browser,
+    )
+    _sessions.start_warm_pool()
     log.info("Listening on %s:%d", settings.host, settings.port)
     yield
     log.info("Shutting down — destroying all sessions...")
-    await app.state.sessions.destroy_all()
+    sessions: SessionsStorage = app.state.sessions
+    open_ids = sessions.open_session_ids()
+    try:
+        await asyncio.wait_for(sessions.close(), timeout=SHUTDOWN_TIMEOUT_S)
+    except TimeoutError:
+        left = sorted(open_ids & sessions.open_session_ids())
+        log.warning(
+            "Sessions did not close within %.0fs; still running: %s",
+            SHUTDOWN_TIMEOUT_S,
+            ", ".join(left) or "none (warm or shared browser still closing)",
+        )
 
 
 app = FastAPI(title="Playcha", version=__version__, lifespan=lifespan)
 
+# Serializes straight to bytes; model_dump_json() would return a str that the
+# response then has to encode again (costly for multi-MB page HTML).
+_V1_RESPONSE_ADAPTER = TypeAdapter(V1Response)
+
 
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
 
 
-@app.get("/")
+# Both bodies are constant for the lifetime of the process.
+_INDEX_BODY = IndexResponse(
+    msg="Playcha is ready!",
+    version=__version__,
+    userAgent="",
+).model_dump_json()
+_HEALTH_BODY = HealthResponse(status=STATUS_OK).model_dump_json()
+
+
+@app.get("/", response_model=IndexResponse)
 async def index():
-    return IndexResponse(
-        msg="Playcha is ready!",
-        version=__version__,
-        userAgent="",
-    )
+    return Response(content=_INDEX_BODY, media_type="application/json")
 
 
-@app.get("/health")
+@app.get("/health", response_model=HealthResponse)
 async def health():
-    return HealthResponse(status=STATUS_OK)
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.post("/v1")
-async def controller_v1(req: V1Request, request: Request):
-    start_ts = int(time.time() * 1000)
+async def controller_v1(req: V1Request):
+    start_ts = time.time_ns() // 1_000_000
     log.info("Incoming request => POST /v1 cmd=%s", req.cmd)
 
     try:
-        res = await _handle_v1(req, request.app.state.sessions)
+        if _sessions is None:
+            raise RuntimeError("lifespan has not run")
+        res = await _handle_v1(req, _sessions)
     except Exception as e:
-        log.error("Error handling request: %s", e, exc_info=True)
+        # Tracebacks are only useful when debugging; skip formatting them otherwise.
+        log.error("Error handling request: %s", e, exc_info=log.isEnabledFor(logging.DEBUG))
         res = V1Response(status=STATUS_ERROR, message=f"Error: {e}")
 
     res.startTimestamp = start_ts
-    res.endTimestamp = int(time.time() * 1000)
+    res.endTimestamp = time.time_ns() // 1_000_000
     res.version = __version__
 
     elapsed = (res.endTimestamp - res.startTimestamp) / 1000
     log.info("Response in %.2fs (status=%s)", elapsed, res.status)
 
     status_code = 500 if res.status == STATUS_ERROR else 200
-    return JSONResponse(content=res.model_dump(exclude_none=True), status_code=status_code)
+    return Response(
+        content=_V1_RESPONSE_ADAPTER.dump_json(res, exclude_none=True),
+        status_code=status_code,
+        media_type="application/json",
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -88,24 +132,20 @@ async def _handle_v1(req: V1Request, sessions: SessionsStorage) -> V1Response:
     if not req.cmd:
         raise Exception("Request parameter 'cmd' is mandatory.")
 
-    if req.proxy is None and settings.default_proxy:
-        req.proxy = ProxyRequest(**settings.default_proxy)
-
+    # Fill in server-side defaults on a shallow copy rather than mutating the
+    # parsed request.
+    defaults: dict[str, Any] = {}
+    if req.proxy is None and settings.default_proxy_model is not None:
+        defaults["proxy"] = settings.default_proxy_model
     if req.maxTimeout < 1:
-        req.maxTimeout = 60000
-
-    if req.cmd == "sessions.create":
-        return await _cmd_sessions_create(req, sessions)
-    if req.cmd == "sessions.list":
-        return await _cmd_sessions_list(sessions)
-    if req.cmd == "sessions.destroy":
-        return await _cmd_sessions_destroy(req, sessions)
-    if req.cmd == "request.get":
-        return await _cmd_request_get(req, sessions)
-    if req.cmd == "request.post":
-        return await _cmd_request_post(req, sessions)
+        defaults["maxTimeout"] = 60000
+    if defaults:
+        req = req.model_copy(update=defaults)
 
-    raise Exception(f"Request parameter 'cmd' = '{req.cmd}' is invalid.")
+    handler = _HANDLERS.get(req.cmd)
+    if handler is None:
+        raise Exception(f"Request parameter 'cmd' = '{req.cmd}' is invalid.")
+    return await handler(req, sessions)
 
 
 # ---------------------------------------------------------------------------
@@ -122,7 +162,7 @@ async def _cmd_sessions_create(req: V1Request, sessions: SessionsStorage) -> V1R
     )
 
 
-async def _cmd_sessions_list(sessions: SessionsStorage) -> V1Response:
+async def _cmd_sessions_list(_req: V1Request, sessions: SessionsStorage) -> V1Response:
     return V1Response(
         status=STATUS_OK,
         message="",
@@ -163,11 +203,32 @@ async def _cmd_request_post(req: V1Request, sessions: SessionsStorage) -> V1Resp
     return await resolve_challenge(req, "POST", sessions)
 
 
+_Handler = Callable[[V1Request, SessionsStorage], Awaitable[V1Response]]
+
+_HANDLERS: dict[str, _Handler] = {
+    "sessions.create": _cmd_sessions_create,
+    "sessions.list": _cmd_sessions_list,
+    "sessions.destroy": _cmd_sessions_destroy,
+    "request.get": _cmd_request_get,
+    "request.post": _cmd_request_post,
+}
+
+
 # ---------------------------------------------------------------------------
 # Entrypoint
 # ---------------------------------------------------------------------------
 
 
+def _event_loop() -> str:
+    """Prefer uvloop when installed (shipped with ``uvicorn[standard]`` outside Windows)."""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def _http_protocol() -> str:
+    """Prefer the httptools parser when installed, falling back to h11."""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
 def main() -> None:
     log_level = settings.log_level.upper()
 
@@ -184,6 +245,12 @@ def main() -> None:
         app,
         host=settings.host,
         port=settings.port,
+        loop=_event_loop(),
+        http=_http_protocol(),
+        ws="none",
+        # Outlive common load balancer idle timeouts (e.g. AWS ALB's 60s) so
+        # clients can reuse connections across /v1 calls.
+        timeout_keep_alive=75,
         log_config=None,
     )
 
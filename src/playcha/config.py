@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import os
 from enum import StrEnum
+from functools import cached_property
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+from .dtos import ProxyRequest
+
 
 class BrowserType(StrEnum):
     CAMOUFOX = "camoufox"
@@ -27,6 +30,9 @@ class Settings(BaseSettings):
     browser: BrowserType = Field(default=BrowserType.CAMOUFOX)
     headless: bool = Field(default=True)
     camoufox_path: str | None = Field(default=None)
+    warm_browsers: int = Field(default=0)
+    session_max_pages: int = Field(default=4)
+    shared_browser: bool = Field(default=False)
 
     proxy_url: str | None = Field(default=None)
     proxy_username: str | None = Field(default=None)
@@ -41,7 +47,7 @@ class Settings(BaseSettings):
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
-    @property
+    @cached_property
     def default_proxy(self) -> dict | None:
         if not self.proxy_url:
             return None
@@ -52,6 +58,12 @@ class Settings(BaseSettings):
             proxy["password"] = self.proxy_password
         return proxy
 
+    @cached_property
+    def default_proxy_model(self) -> ProxyRequest | None:
+        if not self.default_proxy:
+            return None
+        return ProxyRequest(**self.default_proxy)
+
 
 def get_settings() -> Settings:
     return Settings()
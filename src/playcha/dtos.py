@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 STATUS_OK = "ok"
 STATUS_ERROR = "error"
@@ -20,6 +20,10 @@ class ProxyRequest(BaseModel):
 
 
 class V1Request(BaseModel):
+    # FlareSolverr clients may send parameters Playcha doesn't support; drop
+    # them rather than keeping them on every parsed request.
+    model_config = ConfigDict(extra="ignore")
+
     cmd: str
     url: str | None = None
     postData: str | None = None
@@ -28,6 +32,7 @@ class V1Request(BaseModel):
     maxTimeout: int = 60000
     cookies: list[dict[str, Any]] | None = None
     returnOnlyCookies: bool = False
+    returnHTML: bool = True
     returnScreenshot: bool = False
     proxy: ProxyRequest | None = None
     disableMedia: bool = False
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import functools
+import heapq
+import itertools
 import logging
 import os
 import sys
+import time
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
 from typing import TYPE_CHECKING, Any
 from uuid import uuid4
 
@@ -17,33 +21,25 @@ if TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
-def _build_proxy_arg(proxy: ProxyRequest | dict | None) -> dict[str, Any] | None:
+def _build_proxy_arg(proxy: ProxyRequest | None) -> dict[str, Any] | None:
     """Convert a proxy request into the format Playwright expects."""
-    if proxy is None:
+    if proxy is None or not proxy.url:
         return None
-    if isinstance(proxy, dict):
-        url = proxy.get("url")
-        username = proxy.get("username")
-        password = proxy.get("password")
-    else:
-        url = proxy.url
-        username = proxy.username
-        password = proxy.password
-    if not url:
-        return None
-    pw_proxy: dict[str, Any] = {"server": url}
-    if username:
-        pw_proxy["username"] = username
-    if password:
-        pw_proxy["password"] = password
+    pw_proxy: dict[str, Any] = {"server": proxy.url}
+    if proxy.username:
+        pw_proxy["username"] = proxy.username
+    if proxy.password:
+        pw_proxy["password"] = proxy.password
     return pw_proxy
 
 
+@functools.cache
 def _resolve_camoufox_path() -> str | None:
     """Resolve the Camoufox executable path from CAMOUFOX_PATH.
 
     Accepts either a direct path to the binary or a directory containing it.
-    Returns the binary path, or None to let Camoufox auto-detect.
+    Returns the binary path, or None to let Camoufox auto-detect.  Cached, as
+    the setting is fixed for the lifetime of the process.
     """
     path = settings.camoufox_path
     if not path:
@@ -63,32 +59,40 @@ def _resolve_camoufox_path() -> str | None:
 # ---------------------------------------------------------------------------
 
 
-async def _launch_camoufox(
-    proxy: ProxyRequest | dict | None = None,
-) -> tuple[Any, Any, Any]:
-    """Launch a Camoufox browser and return (context_manager, context, page)."""
-    try:
-        from camoufox.async_api import AsyncCamoufox
-    except ImportError as err:
-        raise RuntimeError(
-            "Camoufox is not installed. Install it with: pip install playcha[camoufox]"
-        ) from err
+# Camoufox runs "headless" under a virtual display on Linux (more stealthy).
+_CAMOUFOX_HEADLESS: bool | str = (
+    "virtual" if settings.headless and sys.platform == "linux" else settings.headless
+)
+
 
+@functools.cache
+def _resolve_camoufox_addon_path() -> str | None:
+    """Absolute path of the playwright-captcha init-script addon, if available."""
     try:
         from playwright_captcha.utils.camoufox_add_init_script.add_init_script import (
             get_addon_path,
         )
 
-        addon_path = os.path.abspath(get_addon_path())
+        return os.path.abspath(get_addon_path())
     except Exception:
-        addon_path = None
+        return None
+
 
-    headless: bool | str = settings.headless
-    if headless and sys.platform == "linux":
-        headless = "virtual"
+async def _start_camoufox(
+    proxy: ProxyRequest | None = None,
+) -> tuple[Any, Any]:
+    """Launch a Camoufox browser and return (context_manager, browser)."""
+    try:
+        from camoufox.async_api import AsyncCamoufox
+    except ImportError as err:
+        raise RuntimeError(
+            "Camoufox is not installed. Install it with: pip install playcha[camoufox]"
+        ) from err
+
+    addon_path = _resolve_camoufox_addon_path()
 
     kwargs: dict[str, Any] = {
-        "headless": headless,
+        "headless": _CAMOUFOX_HEADLESS,
         "humanize": True,
         "main_world_eval": True,
         "disable_coop": True,
@@ -116,9 +120,8 @@ async def _launch_camoufox(
         pass
 
     ctx_mgr = AsyncCamoufox(**kwargs)
-    context = await ctx_mgr.__aenter__()
-    page = await context.new_page()
-    return ctx_mgr, context, page
+    browser = await ctx_mgr.__aenter__()
+    return ctx_mgr, browser
 
 
 # ---------------------------------------------------------------------------
@@ -138,17 +141,10 @@ class _PatchrightContextManager:
         await self._playwright.stop()
 
 
-async def _launch_patchright(
-    proxy: ProxyRequest | dict | None = None,
-) -> tuple[Any, Any, Any]:
-    """Launch a Patchright (Chromium) browser and return (context_manager, context, page).
-
-    Patchright has a known bug where ``page.add_init_script`` breaks DNS
-    resolution.  We work around this by monkey-patching the method to
-    collect scripts, then exposing them on ``page._patchright_init_scripts``
-    so they can be injected via ``page.evaluate`` after each navigation.
-    See :func:`inject_patchright_init_scripts`.
-    """
+async def _start_patchright(
+    proxy: ProxyRequest | None = None,
+) -> tuple[Any, Any]:
+    """Launch a Patchright (Chromium) browser and return (context_manager, browser)."""
     try:
         from patchright.async_api import async_playwright
     except ImportError as err:
@@ -167,9 +163,18 @@ async def _launch_patchright(
         launch_kwargs["proxy"] = pw_proxy
 
     browser = await pw.chromium.launch(**launch_kwargs)
-    context = await browser.new_context()
-    page = await context.new_page()
+    return _PatchrightContextManager(pw, browser), browser
+
+
+def _defer_patchright_init_scripts(page: Any) -> None:
+    """Collect ``add_init_script`` calls on *page* instead of registering them.
 
+    Patchright has a known bug where ``page.add_init_script`` breaks DNS
+    resolution.  We work around this by monkey-patching the method to
+    collect scripts, then exposing them on ``page._patchright_init_scripts``
+    so they can be injected via ``page.evaluate`` after each navigation.
+    See :func:`inject_patchright_init_scripts`.
+    """
     _init_scripts: list[str] = []
 
     async def _fake_add_init_script(script: str, **_kwargs: Any) -> None:
@@ -178,9 +183,6 @@ async def _launch_patchright(
     page.add_init_script = _fake_add_init_script  # type: ignore[assignment]
     page._patchright_init_scripts = _init_scripts  # type: ignore[attr-defined]
 
-    ctx_mgr = _PatchrightContextManager(pw, browser)
-    return ctx_mgr, context, page
-
 
 async def inject_patchright_init_scripts(page: Any) -> None:
     """Inject deferred init scripts collected by the Patchright workaround.
@@ -201,17 +203,77 @@ async def inject_patchright_init_scripts(page: Any) -> None:
 # ---------------------------------------------------------------------------
 
 
+async def start_browser(
+    proxy: ProxyRequest | None = None,
+) -> tuple[Any, Any]:
+    """Launch a browser and return (context_manager, browser).
+
+    The caller is responsible for closing via ``context_manager.__aexit__``.
+    The browser backend is selected by the ``BROWSER`` setting.
+    """
+    if settings.browser == BrowserType.PATCHRIGHT:
+        return await _start_patchright(proxy)
+    return await _start_camoufox(proxy)
+
+
 async def launch_browser(
-    proxy: ProxyRequest | dict | None = None,
+    proxy: ProxyRequest | None = None,
 ) -> tuple[Any, Any, Any]:
     """Launch a browser and return (context_manager, context, page).
 
-    The caller is responsible for closing via ``context_manager.__aexit__``.
-    The browser backend is selected by the ``BROWSER`` setting.
+    The caller is responsible for closing via ``context_manager.__aexit__``,
+    which shuts down the whole browser.
+    """
+    ctx_mgr, browser = await start_browser(proxy)
+    try:
+        context = await browser.new_context()
+        page = await new_page(context)
+    except BaseException:
+        with contextlib.suppress(Exception):
+            await ctx_mgr.__aexit__(None, None, None)
+        raise
+    return ctx_mgr, context, page
+
+
+class _ContextCloser:
+    """Stands in for a browser context manager but only closes one context."""
+
+    def __init__(self, context: Any) -> None:
+        self._context = context
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self._context.close()
+
+
+async def open_context(
+    browser: Any,
+    proxy: ProxyRequest | None = None,
+) -> tuple[Any, Any, Any]:
+    """Open an isolated context in a running *browser* and return (context_manager, context, page).
+
+    Closing via ``context_manager.__aexit__`` only closes the context; the
+    browser keeps running.  *proxy* overrides the browser's launch proxy.
     """
+    kwargs: dict[str, Any] = {}
+    pw_proxy = _build_proxy_arg(proxy)
+    if pw_proxy:
+        kwargs["proxy"] = pw_proxy
+    context = await browser.new_context(**kwargs)
+    try:
+        page = await new_page(context)
+    except BaseException:
+        with contextlib.suppress(Exception):
+            await context.close()
+        raise
+    return _ContextCloser(context), context, page
+
+
+async def new_page(context: Any) -> Any:
+    """Open another page in an existing browser context."""
+    page = await context.new_page()
     if settings.browser == BrowserType.PATCHRIGHT:
-        return await _launch_patchright(proxy)
-    return await _launch_camoufox(proxy)
+        _defer_patchright_init_scripts(page)
+    return page
 
 
 @dataclass
@@ -220,72 +282,362 @@ class Session:
     ctx_mgr: Any
     context: Any
     page: Any
-    created_at: datetime = field(default_factory=datetime.now)
+    created_at: float = field(default_factory=time.monotonic)
+    max_pages: int = 1
+    # Monotonic deadline from the latest ``session_ttl_minutes``, if any.
+    expires_at: float | None = None
+    # navigator.userAgent is fixed for the browser's lifetime; filled on first use.
+    user_agent: str = ""
+    # Prepared captcha solvers, one per page, kept until the session closes.
+    solvers: dict[Any, Any] = field(default_factory=dict, repr=False)
+    # Pages whose media-blocking route is installed (see ``disableMedia``).
+    media_blocked: set[Any] = field(default_factory=set, repr=False)
+    # Pages not currently driven by a request.  Pages share the context's
+    # cookies, so a session can serve up to ``max_pages`` requests at once.
+    _idle_pages: asyncio.Queue[Any] = field(init=False, repr=False)
+    _open_pages: int = field(init=False, default=1, repr=False)
+
+    def __post_init__(self) -> None:
+        self._idle_pages = asyncio.Queue()
+        self._idle_pages.put_nowait(self.page)
+
+    def lifetime(self) -> float:
+        """Seconds elapsed since the session was created."""
+        return time.monotonic() - self.created_at
+
+    async def acquire_page(self) -> Any:
+        """Borrow an idle page, opening a new one if all are busy and below ``max_pages``.
+
+        Every acquired page must be handed back with :meth:`release_page`.
+        """
+        try:
+            return self._idle_pages.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        if self._open_pages < self.max_pages:
+            self._open_pages += 1
+            try:
+                return await new_page(self.context)
+            except BaseException:
+                self._open_pages -= 1
+                raise
+        return await self._idle_pages.get()
+
+    def release_page(self, page: Any) -> None:
+        self._idle_pages.put_nowait(page)
+
+    def busy(self) -> bool:
+        """True while any page is lent out to a request."""
+        return self._idle_pages.qsize() < self._open_pages
+
+    async def drain(self) -> None:
+        """Wait until every lent-out page is released, keeping them all so none is lent again."""
+        taken = 0
+        while taken < self._open_pages:
+            await self._idle_pages.get()
+            taken += 1
+
 
-    def lifetime(self) -> timedelta:
-        return datetime.now() - self.created_at
+# How long to wait before re-checking an expired session that is still busy.
+_EXPIRY_RETRY_S = 5.0
 
 
 class SessionsStorage:
-    def __init__(self) -> None:
+    def __init__(self, warm_browsers: int = 0, shared_browser: bool = False) -> None:
         self._sessions: dict[str, Session] = {}
+        # With a shared browser every session / request gets its own context
+        # in one long-lived browser process instead of a browser of its own.
+        self._shared = shared_browser
+        self._shared_browser: tuple[Any, Any] | None = None
+        self._shared_lock = asyncio.Lock()
+        # Browsers pre-launched with the default proxy, handed out by
+        # acquire_browser() so requests skip the cold start.
+        self._warm_size = warm_browsers
+        self._warm: asyncio.Queue[tuple[Any, Any, Any]] = asyncio.Queue()
+        self._refill_task: asyncio.Task[None] | None = None
+        # Sessions whose browser is still launching.  The lock only guards
+        # the reservation; the launch itself runs outside it so independent
+        # sessions can start in parallel.
+        self._pending: dict[str, asyncio.Future[Session]] = {}
         self._lock = asyncio.Lock()
+        # Min-heap of (expires_at, seq, session) so the sweeper only ever
+        # looks at the session that expires first.  Entries made stale by a
+        # destroy or a TTL change are skipped when popped.
+        self._expiry_heap: list[tuple[float, int, Session]] = []
+        self._expiry_seq = itertools.count()
+        self._expiry_changed = asyncio.Event()
+        self._sweep_task: asyncio.Task[None] | None = None
+        # Session closes in progress, each task named after its session id.
+        # close() waits for them, since the sessions they tear down are no
+        # longer visible to destroy_all().
+        self._closing: set[asyncio.Task[None]] = set()
 
     async def create(
         self,
         session_id: str | None = None,
-        proxy: ProxyRequest | dict | None = None,
+        proxy: ProxyRequest | None = None,
     ) -> tuple[Session, bool]:
         session_id = session_id or str(uuid4())
 
-        async with self._lock:
-            if session_id in self._sessions:
-                return self._sessions[session_id], False
-
-            ctx_mgr, context, page = await launch_browser(proxy)
-            session = Session(
-                session_id=session_id,
-                ctx_mgr=ctx_mgr,
-                context=context,
-                page=page,
-            )
-            self._sessions[session_id] = session
-            log.info("Session created: %s", session_id)
-            return session, True
+        while True:
+            async with self._lock:
+                if session_id in self._sessions:
+                    return self._sessions[session_id], False
+                pending = self._pending.get(session_id)
+                if pending is None:
+                    pending = asyncio.get_running_loop().create_future()
+                    self._pending[session_id] = pending
+                    break
+
+            # Another request is already launching this session; wait for it
+            # instead of starting a duplicate browser.  asyncio.wait leaves
+            # the future alone if we are cancelled, and if the launching
+            # request was cancelled instead we go round and launch it here.
+            await asyncio.wait({pending})
+            if not pending.cancelled():
+                return pending.result(), False
+
+        try:
+            ctx_mgr, context, page = await self.acquire_browser(proxy)
+        except BaseException as exc:
+            del self._pending[session_id]
+            if isinstance(exc, Exception):
+                pending.set_exception(exc)
+                # Mark the exception as retrieved in case nobody else was waiting.
+                pending.exception()
+            else:
+                pending.cancel()
+            raise
+
+        session = Session(
+            session_id=session_id,
+            ctx_mgr=ctx_mgr,
+            context=context,
+            page=page,
+            max_pages=settings.session_max_pages,
+        )
+        del self._pending[session_id]
+        self._sessions[session_id] = session
+        pending.set_result(session)
+        log.info("Session created: %s", session_id)
+        return session, True
+
+    def start_warm_pool(self) -> None:
+        """Start pre-launching browsers in the background (no-op when disabled)."""
+        if self._shared:
+            self._refill_task = asyncio.create_task(self._warm_shared_browser())
+        elif self._warm_size > 0:
+            self._schedule_refill()
+
+    async def _warm_shared_browser(self) -> None:
+        try:
+            await self._get_shared_browser()
+        except Exception:
+            log.warning("Failed to pre-launch the shared browser", exc_info=True)
+
+    async def _get_shared_browser(self) -> Any:
+        async with self._shared_lock:
+            if self._shared_browser is not None and not self._shared_browser[1].is_connected():
+                log.warning("Shared browser disconnected, relaunching")
+                await self._close_shared_browser()
+            if self._shared_browser is None:
+                self._shared_browser = await start_browser(settings.default_proxy_model)
+            return self._shared_browser[1]
+
+    async def _close_shared_browser(self) -> None:
+        if self._shared_browser is None:
+            return
+        ctx_mgr, _browser = self._shared_browser
+        self._shared_browser = None
+        try:
+            await ctx_mgr.__aexit__(None, None, None)
+        except Exception:
+            log.warning("Error closing shared browser", exc_info=True)
+
+    def _schedule_refill(self) -> None:
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill_warm())
+
+    async def _refill_warm(self) -> None:
+        while self._warm.qsize() < self._warm_size:
+            try:
+                browser = await launch_browser(settings.default_proxy_model)
+            except Exception:
+                log.warning("Failed to pre-launch a warm browser", exc_info=True)
+                return
+            self._warm.put_nowait(browser)
+            log.debug("Warm browser ready (%d/%d)", self._warm.qsize(), self._warm_size)
+
+    async def acquire_browser(
+        self,
+        proxy: ProxyRequest | None = None,
+    ) -> tuple[Any, Any, Any]:
+        """Return a (context_manager, context, page) triple, like :func:`launch_browser`.
+
+        With a shared browser this opens a new context in it.  Otherwise uses a
+        pre-launched browser when one is available, still connected and *proxy*
+        matches the default proxy the pool was launched with, or launches a new
+        one.
+        """
+        default_proxy = settings.default_proxy_model
+        if self._shared:
+            browser = await self._get_shared_browser()
+            same_proxy = _build_proxy_arg(proxy) == _build_proxy_arg(default_proxy)
+            return await open_context(browser, None if same_proxy else proxy)
+        if self._warm_size > 0 and _build_proxy_arg(proxy) == _build_proxy_arg(default_proxy):
+            try:
+                while not self._warm.empty():
+                    ctx_mgr, context, page = self._warm.get_nowait()
+                    if context.browser is not None and context.browser.is_connected():
+                        return ctx_mgr, context, page
+                    log.warning("Warm browser disconnected, discarding it")
+                    with contextlib.suppress(Exception):
+                        await ctx_mgr.__aexit__(None, None, None)
+            finally:
+                self._schedule_refill()
+        return await launch_browser(proxy)
 
     def exists(self, session_id: str) -> bool:
         return session_id in self._sessions
 
     async def destroy(self, session_id: str) -> bool:
+        while True:
+            async with self._lock:
+                session = self._sessions.pop(session_id, None)
+                pending = None if session is not None else self._pending.get(session_id)
+            if pending is None:
+                break
+            # Still launching: wait for it so the browser is closed here
+            # instead of the session coming up after it was destroyed.
+            await asyncio.wait({pending})
+        if session is None:
+            return False
+        await asyncio.shield(self._start_close(session))
+        return True
+
+    async def _retire(
+        self, session: Session, *, if_idle: bool = False, drain: bool = False
+    ) -> bool:
+        """Destroy *session* unless it was already destroyed or replaced.
+
+        Expiry checks hold a reference to the session they inspected; going by
+        identity rather than id keeps a concurrent check from tearing down the
+        replacement another request just launched.
+
+        With *if_idle*, a session that is serving a request is left alone and
+        False is returned.  The check happens under the lock, so no request
+        can borrow a page between it and the removal.  With *drain*, the
+        session is removed at once but only closed after its in-flight
+        requests hand their pages back; the caller does not wait for that.
+        """
         async with self._lock:
-            if session_id not in self._sessions:
+            if self._sessions.get(session.session_id) is not session:
+                return True
+            if if_idle and session.busy():
                 return False
-            session = self._sessions.pop(session_id)
+            del self._sessions[session.session_id]
+        close = self._start_close(session, drain=drain)
+        if not drain:
+            # Cancelling the caller (e.g. the sweeper on shutdown) must not
+            # cut the close short: the session is already out of _sessions.
+            await asyncio.shield(close)
+        return True
+
+    def _start_close(self, session: Session, *, drain: bool = False) -> asyncio.Task[None]:
+        close = asyncio.create_task(self._close(session, drain=drain), name=session.session_id)
+        self._closing.add(close)
+        close.add_done_callback(self._closing.discard)
+        return close
+
+    async def _close(self, session: Session, *, drain: bool = False) -> None:
+        if drain:
+            await session.drain()
+        for solver in session.solvers.values():
+            with contextlib.suppress(Exception):
+                await solver.__aexit__(None, None, None)
         try:
             await session.ctx_mgr.__aexit__(None, None, None)
         except Exception:
-            log.warning("Error closing session %s", session_id, exc_info=True)
-        log.info("Session destroyed: %s", session_id)
-        return True
+            log.warning("Error closing session %s", session.session_id, exc_info=True)
+        log.info("Session destroyed: %s", session.session_id)
 
     async def get(
         self,
         session_id: str,
-        ttl: timedelta | None = None,
-        proxy: ProxyRequest | dict | None = None,
+        ttl_s: float | None = None,
+        proxy: ProxyRequest | None = None,
     ) -> tuple[Session, bool]:
         session, fresh = await self.create(session_id, proxy)
 
-        if ttl is not None and not fresh and session.lifetime() > ttl:
-            log.debug("Session %s expired (ttl=%s), recreating", session_id, ttl)
-            await self.destroy(session_id)
+        if ttl_s is not None and not fresh and session.lifetime() > ttl_s:
+            log.debug("Session %s expired (ttl=%.0fs), recreating", session_id, ttl_s)
+            # Other requests may still be driving its pages; the old browser
+            # is closed once they are done, not under them.
+            await self._retire(session, drain=True)
             session, fresh = await self.create(session_id, proxy)
 
+        if ttl_s is not None:
+            self._schedule_expiry(session, session.created_at + ttl_s)
+
         return session, fresh
 
-    def session_ids(self) -> list[str]:
-        return list(self._sessions.keys())
+    def _schedule_expiry(self, session: Session, expires_at: float) -> None:
+        if session.expires_at == expires_at:
+            return
+        session.expires_at = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._expiry_seq), session))
+        self._expiry_changed.set()
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_expired())
+
+    async def _sweep_expired(self) -> None:
+        """Destroy sessions once their TTL passes, even if they are never requested again."""
+        while True:
+            self._expiry_changed.clear()
+            delay = self._expiry_heap[0][0] - time.monotonic() if self._expiry_heap else None
+            if delay is None or delay > 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._expiry_changed.wait(), timeout=delay)
+                continue
+
+            expires_at, _seq, session = heapq.heappop(self._expiry_heap)
+            if (
+                self._sessions.get(session.session_id) is not session
+                or session.expires_at != expires_at
+            ):
+                continue
+            log.debug("Session %s expired", session.session_id)
+            if not await self._retire(session, if_idle=True):
+                # Never pull the browser out from under an in-flight request.
+                self._schedule_expiry(session, time.monotonic() + _EXPIRY_RETRY_S)
+
+    def session_ids(self) -> tuple[str, ...]:
+        return tuple(self._sessions)
+
+    def open_session_ids(self) -> set[str]:
+        """Ids of sessions whose browser is launching, open or still closing."""
+        return {*self._sessions, *self._pending, *(task.get_name() for task in self._closing)}
+
+    async def close(self) -> None:
+        """Stop the background tasks and destroy every session."""
+        for task in (self._refill_task, self._sweep_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        while not self._warm.empty():
+            ctx_mgr, _context, _page = self._warm.get_nowait()
+            try:
+                await ctx_mgr.__aexit__(None, None, None)
+            except Exception:
+                log.warning("Error closing warm browser", exc_info=True)
+        await self.destroy_all()
+        await self._close_shared_browser()
 
     async def destroy_all(self) -> None:
-        for sid in list(self._sessions.keys()):
-            await self.destroy(sid)
+        await asyncio.gather(
+            *(self.destroy(sid) for sid in {*self._sessions, *self._pending}),
+            return_exceptions=True,
+        )
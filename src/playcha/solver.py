@@ -3,10 +3,11 @@ from __future__ import annotations
 import asyncio
 import base64
 import contextlib
+import functools
 import logging
-from typing import Any
-
-from playwright_captcha import CaptchaType, ClickSolver, FrameworkType
+import re
+from typing import TYPE_CHECKING, Any, NamedTuple
+from urllib.parse import urlsplit
 
 from .config import BrowserType, CaptchaSolverType, settings
 from .dtos import (
@@ -16,7 +17,12 @@ from .dtos import (
     V1Request,
     V1Response,
 )
-from .sessions import SessionsStorage, inject_patchright_init_scripts, launch_browser
+from .sessions import Session, SessionsStorage, inject_patchright_init_scripts
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+    from playwright_captcha import CaptchaType, FrameworkType
 
 log = logging.getLogger(__name__)
 
@@ -24,30 +30,30 @@ log = logging.getLogger(__name__)
 # Challenge detection heuristics (ported from FlareSolverr)
 # ---------------------------------------------------------------------------
 
-ACCESS_DENIED_TITLES = [
+ACCESS_DENIED_TITLES = (
     "Access denied",
     "Attention Required! | Cloudflare",
-]
+)
 
-ACCESS_DENIED_SELECTORS = [
+ACCESS_DENIED_SELECTORS = (
     "div.cf-error-title span.cf-code-label span",
     "#cf-error-details div.cf-error-overview h1",
-]
+)
 
-CHALLENGE_TITLES = [
+CHALLENGE_TITLES = (
     "Just a moment...",
     "DDoS-Guard",
-]
+)
 
 # Cloudflare localizes the challenge page title.  Rather than maintaining
 # translations for every locale, match the page by selectors as the primary
 # signal and treat the title as a secondary hint.
-CHALLENGE_TITLE_FRAGMENTS = [
+CHALLENGE_TITLE_FRAGMENTS = (
     "moment",
     "ddos",
-]
+)
 
-CHALLENGE_SELECTORS = [
+CHALLENGE_SELECTORS = (
     "#cf-challenge-running",
     ".ray_id",
     ".attack-box",
@@ -58,20 +64,37 @@ CHALLENGE_SELECTORS = [
     ".lds-ring",
     "td.info #js_info",
     "div.vc div.text-box h2",
-]
+)
 
-TURNSTILE_SELECTORS = [
+TURNSTILE_SELECTORS = (
     "input[name='cf-turnstile-response']",
-]
+)
 
-_FRAMEWORK_MAP = {
-    BrowserType.CAMOUFOX: FrameworkType.CAMOUFOX,
-    BrowserType.PATCHRIGHT: FrameworkType.PATCHRIGHT,
+CF_IFRAME_SELECTOR = 'iframe[src*="challenges.cloudflare.com"]'
+
+# A title is a challenge if it contains any known title or fragment; one
+# case-insensitive regex search replaces the per-call lowercase + loops.
+_CHALLENGE_TITLE_RE = re.compile(
+    "|".join(map(re.escape, CHALLENGE_TITLES + CHALLENGE_TITLE_FRAGMENTS)),
+    re.IGNORECASE,
+)
+
+_FRAMEWORK_NAMES = {
+    BrowserType.CAMOUFOX: "CAMOUFOX",
+    BrowserType.PATCHRIGHT: "PATCHRIGHT",
 }
 
 
+@functools.cache
+def _captcha_lib() -> ModuleType:
+    """Import playwright-captcha on first use; it pulls in all of Playwright."""
+    import playwright_captcha
+
+    return playwright_captcha
+
+
 def _get_framework() -> FrameworkType:
-    return _FRAMEWORK_MAP[settings.browser]
+    return _captcha_lib().FrameworkType[_FRAMEWORK_NAMES[settings.browser]]
 
 
 # ---------------------------------------------------------------------------
@@ -79,37 +102,125 @@ def _get_framework() -> FrameworkType:
 # ---------------------------------------------------------------------------
 
 
-async def _elements_exist(page: Any, selectors: list[str]) -> bool:
-    for sel in selectors:
+# Checks every selector in a single round-trip to the browser.  Open shadow
+# roots are searched too, matching Playwright's piercing CSS engine.
+_ANY_SELECTOR_MATCHES_JS = """(selectors) => {
+    const roots = [document];
+    for (let i = 0; i < roots.length; i++) {
+        for (const sel of selectors) {
+            try {
+                if (roots[i].querySelector(sel)) return true;
+            } catch (e) {}
+        }
+        for (const el of roots[i].querySelectorAll("*")) {
+            if (el.shadowRoot) roots.push(el.shadowRoot);
+        }
+    }
+    return false;
+}"""
+
+
+# In-page predicate for page.wait_for_function: true once neither a challenge
+# title nor a challenge selector is present, or as soon as the optional
+# iframe selector matches.
+_CHALLENGE_SETTLED_JS = f"""([titles, selectors, iframeSelector]) => {{
+    const anyMatches = {_ANY_SELECTOR_MATCHES_JS};
+    if (iframeSelector && anyMatches([iframeSelector])) return true;
+    const title = document.title.toLowerCase();
+    if (titles.some((t) => title.includes(t))) return false;
+    return !anyMatches(selectors);
+}}"""
+
+# Finds the Turnstile response input (open shadow roots included) and returns
+# its value in the same round-trip.
+_TURNSTILE_TOKEN_JS = """(selectors) => {
+    const roots = [document];
+    for (let i = 0; i < roots.length; i++) {
+        for (const sel of selectors) {
+            const el = roots[i].querySelector(sel);
+            if (el) return el.getAttribute("value");
+        }
+        for (const el of roots[i].querySelectorAll("*")) {
+            if (el.shadowRoot) roots.push(el.shadowRoot);
+        }
+    }
+    return null;
+}"""
+
+_CHALLENGE_TITLE_NEEDLES = [t.lower() for t in CHALLENGE_TITLES + CHALLENGE_TITLE_FRAGMENTS]
+
+# Reads the title and checks every selector group in one round-trip (and one
+# walk over the document and its open shadow roots).
+_PAGE_PROBE_JS = """(groups) => {
+    const found = groups.map(() => false);
+    const roots = [document];
+    for (let i = 0; i < roots.length; i++) {
+        groups.forEach((selectors, g) => {
+            if (found[g]) return;
+            for (const sel of selectors) {
+                try {
+                    if (roots[i].querySelector(sel)) {
+                        found[g] = true;
+                        return;
+                    }
+                } catch (e) {}
+            }
+        });
+        for (const el of roots[i].querySelectorAll("*")) {
+            if (el.shadowRoot) roots.push(el.shadowRoot);
+        }
+    }
+    return [document.title, ...found];
+}"""
+
+_PAGE_PROBE_GROUPS = [
+    list(CHALLENGE_SELECTORS),
+    list(ACCESS_DENIED_SELECTORS),
+    list(TURNSTILE_SELECTORS),
+    [CF_IFRAME_SELECTOR],
+]
+
+
+class _PageProbe(NamedTuple):
+    title: str
+    challenge_selector: bool
+    access_denied_selector: bool
+    turnstile: bool
+    iframe: bool
+
+    @property
+    def challenge(self) -> bool:
+        return _title_is_challenge(self.title) or self.challenge_selector
+
+
+_NO_PROBE = _PageProbe("", False, False, False, False)
+
+
+async def _probe_page(page: Any) -> _PageProbe:
+    """Snapshot the challenge-related signals of *page* in one evaluate.
+
+    If the evaluate fails (typically because the page navigated mid-call and
+    destroyed the execution context), the new document is probed once more.
+    Should that fail too, a negative probe (empty title, nothing found) is
+    returned, so callers treat the page as challenge-free.
+    """
+    for _ in range(2):
         try:
-            els = await page.query_selector_all(sel)
-            if els:
-                return True
-        except Exception:
-            pass
-    return False
+            return _PageProbe(*await page.evaluate(_PAGE_PROBE_JS, _PAGE_PROBE_GROUPS))
+        except Exception as e:
+            log.debug("Page probe failed: %s", e)
+    return _NO_PROBE
 
 
 def _title_is_challenge(title: str | None) -> bool:
     """Return True if *title* matches a known Cloudflare challenge title."""
-    if not title:
-        return False
-    lower = title.lower()
-    for t in CHALLENGE_TITLES:
-        if lower == t.lower():
-            return True
-    return any(fragment in lower for fragment in CHALLENGE_TITLE_FRAGMENTS)
+    return bool(title) and _CHALLENGE_TITLE_RE.search(title) is not None
 
 
 async def _detect_challenge(page: Any) -> bool:
-    title = await page.title()
-    for t in ACCESS_DENIED_TITLES:
-        if title and title.startswith(t):
-            raise Exception(
-                "Cloudflare has blocked this request. "
-                "Probably your IP is banned for this site, check in your web browser."
-            )
-    if await _elements_exist(page, ACCESS_DENIED_SELECTORS):
+    probe = await _probe_page(page)
+    title = probe.title
+    if probe.access_denied_selector or (title and title.startswith(ACCESS_DENIED_TITLES)):
         raise Exception(
             "Cloudflare has blocked this request. "
             "Probably your IP is banned for this site, check in your web browser."
@@ -118,65 +229,169 @@ async def _detect_challenge(page: Any) -> bool:
     if _title_is_challenge(title):
         log.info("Challenge detected. Title: %s", title)
         return True
-    if await _elements_exist(page, CHALLENGE_SELECTORS):
+    if probe.challenge_selector:
         log.info("Challenge detected via selector.")
         return True
 
     return False
 
 
-async def _detect_turnstile(page: Any) -> bool:
-    return await _elements_exist(page, TURNSTILE_SELECTORS)
+async def _none() -> None:
+    return None
+
+
+async def _read_turnstile_token(page: Any) -> str | None:
+    """Return the Turnstile response token from the page, if present."""
+    try:
+        return await page.evaluate(_TURNSTILE_TOKEN_JS, list(TURNSTILE_SELECTORS))
+    except Exception:
+        return None
 
 
 async def _challenge_still_present(page: Any) -> bool:
     """Check whether a Cloudflare challenge page is still showing.
 
-    A destroyed execution context (navigation in progress) is treated as
+    A page that cannot be probed (navigation in progress) is treated as
     "challenge gone" because it means the page is redirecting away from the
     challenge screen.
     """
+    return (await _probe_page(page)).challenge
+
+
+async def _wait_challenge_settled(page: Any, timeout_s: float, *, iframe: bool = False) -> None:
+    """Block until the challenge looks gone (or, with *iframe*, the CF iframe appears).
+
+    The check runs inside the page, so this returns within ~100ms of the
+    change instead of on the next Python-side poll.  Returns quietly on
+    timeout or navigation; callers re-check the page afterwards.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
     try:
-        title = await page.title()
+        await page.wait_for_function(
+            _CHALLENGE_SETTLED_JS,
+            arg=[
+                _CHALLENGE_TITLE_NEEDLES,
+                list(CHALLENGE_SELECTORS),
+                CF_IFRAME_SELECTOR if iframe else None,
+            ],
+            timeout=max(timeout_s, 0.001) * 1000,
+            polling=100,
+        )
     except Exception:
-        return False
-    if _title_is_challenge(title):
-        return True
-    return await _elements_exist(page, CHALLENGE_SELECTORS)
+        # Navigation or page errors can end the wait immediately; don't spin.
+        if loop.time() - started < 0.25:
+            await asyncio.sleep(0.25)
 
 
 async def _wait_challenge_solved(page: Any, timeout_s: float) -> None:
     """Wait until challenge titles/selectors disappear or timeout."""
-    deadline = asyncio.get_event_loop().time() + timeout_s
-    while asyncio.get_event_loop().time() < deadline:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
+    while loop.time() < deadline:
         if not await _challenge_still_present(page):
             return
-        await asyncio.sleep(1)
+        await _wait_challenge_settled(page, deadline - loop.time())
     raise Exception(f"Challenge not solved within {timeout_s}s timeout.")
 
 
-CF_IFRAME_SELECTOR = 'iframe[src*="challenges.cloudflare.com"]'
+def _is_cf_frame(frame: Any) -> bool:
+    return "challenges.cloudflare.com" in frame.url
+
+
+def _cf_iframe_present(page: Any, probe: _PageProbe) -> bool:
+    """Return True if the Cloudflare challenge iframe is on the page."""
+    if probe.iframe:
+        log.debug("CF iframe found in DOM.")
+        return True
+    # The frames API also sees cross-origin frames hidden from the DOM, and
+    # is local state (no browser round-trip).
+    try:
+        for frame in page.frames:
+            if _is_cf_frame(frame):
+                log.debug("CF frame found via Playwright API: %s", frame.url)
+                return True
+    except Exception:
+        pass
+    return False
+
+
+async def _wait_cf_frame(page: Any, timeout_s: float) -> None:
+    """Block until a Cloudflare challenge frame navigates in, or *timeout_s* passes."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
+    event = asyncio.ensure_future(
+        page.wait_for_event(
+            "framenavigated", predicate=_is_cf_frame, timeout=max(timeout_s, 0.001) * 1000
+        )
+    )
+    try:
+        # Let the listener register, then look at the frames already there so
+        # a frame that navigated in before it was listening is not missed.
+        await asyncio.sleep(0)
+        with contextlib.suppress(Exception):
+            if any(_is_cf_frame(frame) for frame in page.frames):
+                return
+        with contextlib.suppress(Exception):
+            await event
+            return
+    finally:
+        event.cancel()
+    # Page errors end the wait early; leave the race to the other waiter.
+    await asyncio.sleep(max(deadline - loop.time(), 0))
 
 
+async def _wait_challenge_or_iframe(page: Any, timeout_s: float) -> None:
+    """Race the in-page settled check against a CF frame appearing.
+
+    Either event wakes the caller immediately, instead of on a fixed poll.
+    """
+    waiters = [
+        asyncio.create_task(_wait_challenge_settled(page, timeout_s, iframe=True)),
+        asyncio.create_task(_wait_cf_frame(page, timeout_s)),
+    ]
+    try:
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
 
 async def _extract_cookies(page: Any) -> list[CookieResponse]:
-    context = page.context
-    raw_cookies = await context.cookies()
-    result: list[CookieResponse] = []
-    for c in raw_cookies:
-        result.append(
-            CookieResponse(
-                name=c.get("name", ""),
-                value=c.get("value", ""),
-                domain=c.get("domain"),
-                path=c.get("path"),
-                expires=c.get("expires"),
-                httpOnly=c.get("httpOnly"),
-                secure=c.get("secure"),
-                sameSite=c.get("sameSite"),
-            )
+    raw_cookies = await page.context.cookies()
+    # Playwright already returns well-typed cookies; skip re-validating them.
+    return [
+        CookieResponse.model_construct(
+            name=c["name"],
+            value=c["value"],
+            domain=c.get("domain"),
+            path=c.get("path"),
+            expires=c.get("expires"),
+            httpOnly=c.get("httpOnly"),
+            secure=c.get("secure"),
+            sameSite=c.get("sameSite"),
         )
-    return result
+        for c in raw_cookies
+    ]
+
+
+def _cookies_affect(url: str, cookies: list[dict[str, Any]]) -> bool:
+    """Return True if any of *cookies* would be sent to *url*'s host.
+
+    Cookies without a ``url`` or ``domain`` are assumed to apply.
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    for cookie in cookies:
+        if cookie.get("url"):
+            cookie_host = (urlsplit(cookie["url"]).hostname or "").lower()
+            if cookie_host == host:
+                return True
+            continue
+        domain = (cookie.get("domain") or "").lower().lstrip(".")
+        if not domain or host == domain or host.endswith("." + domain):
+            return True
+    return False
 
 
 async def _get_user_agent(page: Any) -> str:
@@ -186,17 +401,90 @@ async def _get_user_agent(page: Any) -> str:
         return ""
 
 
+async def _session_user_agent(page: Any, session: Session | None) -> str:
+    """Like :func:`_get_user_agent`, but remembered for the lifetime of a session."""
+    if session is None:
+        return await _get_user_agent(page)
+    if not session.user_agent:
+        session.user_agent = await _get_user_agent(page)
+    return session.user_agent
+
+
+# Matched by Playwright itself, so only requests for images, CSS and fonts are
+# routed through Python; everything else goes straight to the network.
+_MEDIA_URL_RE = re.compile(
+    r"\.(?:png|jpe?g|gif|webp|avif|svg|ico|bmp|css|woff2?|ttf|otf|eot)(?:[?#]|$)",
+    re.IGNORECASE,
+)
+
+
+async def _abort_route(route: Any) -> None:
+    await route.abort()
+
+
 async def _block_media(page: Any) -> None:
     """Intercept and abort requests for images, CSS, and fonts."""
-    blocked = {"image", "stylesheet", "font"}
+    await page.route(_MEDIA_URL_RE, _abort_route)
+
+
+async def _unblock_media(page: Any) -> None:
+    """Undo :func:`_block_media` on a page that outlives the request."""
+    with contextlib.suppress(Exception):
+        await page.unroute(_MEDIA_URL_RE, _abort_route)
+
+
+async def _sync_media_blocking(page: Any, session: Session, block: bool) -> None:
+    """Install or remove the media route on a session page only when it changes.
+
+    Back-to-back ``disableMedia`` requests reuse the route already in place.
+    """
+    if block and page not in session.media_blocked:
+        await _block_media(page)
+        session.media_blocked.add(page)
+    elif not block and page in session.media_blocked:
+        await _unblock_media(page)
+        session.media_blocked.discard(page)
+
+
+@functools.cache
+def _api_client(client_cls: type, api_key: str) -> Any:
+    """Return a shared API client; they hold no per-request state."""
+    return client_cls(api_key)
 
-    async def handler(route: Any) -> None:
-        if route.request.resource_type in blocked:
-            await route.abort()
-        else:
-            await route.continue_()
 
-    await page.route("**/*", handler)
+@functools.cache
+def _load_twocaptcha() -> tuple[type, type]:
+    """Import the 2Captcha client and solver classes once."""
+    from playwright_captcha import TwoCaptchaSolver
+    from twocaptcha import AsyncTwoCaptcha
+
+    return AsyncTwoCaptcha, TwoCaptchaSolver
+
+
+@functools.cache
+def _load_tencaptcha() -> tuple[type, type]:
+    """Import the 10Captcha client and solver classes once."""
+    try:
+        from playwright_captcha.solvers.api.tencaptcha.tencaptcha_solver import (  # type: ignore[import-not-found]
+            TenCaptchaSolver,
+        )
+        from tencaptcha import AsyncTenCaptcha  # type: ignore[import-not-found]
+    except ImportError as err:
+        raise Exception("Install tencaptcha package for tencaptcha solver.") from err
+    return AsyncTenCaptcha, TenCaptchaSolver
+
+
+@functools.cache
+def _load_captchaai() -> tuple[type, type]:
+    """Import the CaptchaAI client and solver classes once."""
+    try:
+        from captchaai import AsyncCaptchaAI  # type: ignore[import-not-found]
+        from playwright_captcha.solvers.api.captchaai.captchaai_solver import (  # type: ignore[import-not-found]
+            CaptchaAISolver,
+        )
+    except ImportError as err:
+        raise Exception("Install captchaai package for captchaai solver.") from err
+    return AsyncCaptchaAI, CaptchaAISolver
 
 
 async def _get_api_solver(page: Any) -> Any:
@@ -204,50 +492,37 @@ async def _get_api_solver(page: Any) -> Any:
     solver_type = settings.captcha_solver
 
     if solver_type == CaptchaSolverType.TWOCAPTCHA:
-        from playwright_captcha import TwoCaptchaSolver
-        from twocaptcha import AsyncTwoCaptcha
-
         if not settings.two_captcha_api_key:
             raise Exception("TWO_CAPTCHA_API_KEY is required for twocaptcha solver.")
-        client = AsyncTwoCaptcha(settings.two_captcha_api_key)
-        return TwoCaptchaSolver(framework=_get_framework(), page=page, async_two_captcha_client=client)
+        client_cls, solver_cls = _load_twocaptcha()
+        client = _api_client(client_cls, settings.two_captcha_api_key)
+        return solver_cls(framework=_get_framework(), page=page, async_two_captcha_client=client)
 
     if solver_type == CaptchaSolverType.TENCAPTCHA:
         if not settings.ten_captcha_api_key:
             raise Exception("TEN_CAPTCHA_API_KEY is required for tencaptcha solver.")
-        try:
-            from playwright_captcha.solvers.api.tencaptcha.tencaptcha_solver import (  # type: ignore[import-not-found]
-                TenCaptchaSolver,
-            )
-            from tencaptcha import AsyncTenCaptcha  # type: ignore[import-not-found]
-        except ImportError as err:
-            raise Exception("Install tencaptcha package for tencaptcha solver.") from err
-        client = AsyncTenCaptcha(settings.ten_captcha_api_key)
-        return TenCaptchaSolver(framework=_get_framework(), page=page, async_ten_captcha_client=client)
+        client_cls, solver_cls = _load_tencaptcha()
+        client = _api_client(client_cls, settings.ten_captcha_api_key)
+        return solver_cls(framework=_get_framework(), page=page, async_ten_captcha_client=client)
 
     if solver_type == CaptchaSolverType.CAPTCHAAI:
         if not settings.captcha_ai_api_key:
             raise Exception("CAPTCHA_AI_API_KEY is required for captchaai solver.")
-        try:
-            from captchaai import AsyncCaptchaAI  # type: ignore[import-not-found]
-            from playwright_captcha.solvers.api.captchaai.captchaai_solver import (  # type: ignore[import-not-found]
-                CaptchaAISolver,
-            )
-        except ImportError as err:
-            raise Exception("Install captchaai package for captchaai solver.") from err
-        client = AsyncCaptchaAI(settings.captcha_ai_api_key)
-        return CaptchaAISolver(framework=_get_framework(), page=page, async_captcha_ai_client=client)
+        client_cls, solver_cls = _load_captchaai()
+        client = _api_client(client_cls, settings.captcha_ai_api_key)
+        return solver_cls(framework=_get_framework(), page=page, async_captcha_ai_client=client)
 
     return None
 
 
 def _guess_captcha_type(page_title: str, has_turnstile: bool) -> CaptchaType:
     """Best-effort guess of captcha type from page signals."""
+    captcha_type = _captcha_lib().CaptchaType
     if has_turnstile:
-        return CaptchaType.CLOUDFLARE_TURNSTILE
+        return captcha_type.CLOUDFLARE_TURNSTILE
     if _title_is_challenge(page_title):
-        return CaptchaType.CLOUDFLARE_INTERSTITIAL
-    return CaptchaType.CLOUDFLARE_INTERSTITIAL
+        return captcha_type.CLOUDFLARE_INTERSTITIAL
+    return captcha_type.CLOUDFLARE_INTERSTITIAL
 
 
 # ---------------------------------------------------------------------------
@@ -262,49 +537,37 @@ async def _solve_challenge(
 
     The solver context must already be entered (init scripts registered).
     Reloads the page so init scripts execute before Cloudflare's challenge
-    JS, then uses a unified polling loop that watches for:
+    JS, then waits (event-driven, no fixed poll) for either of:
       - auto-solve (JS-only challenge completed the computation)
       - interactive Turnstile iframe appeared (needs solver click/API)
 
     Returns a turnstile token string if one was captured, else None.
     Raises if the challenge is never solved within *timeout_s*.
     """
-    has_turnstile = await _detect_turnstile(page)
-    captcha_type = _guess_captcha_type(await page.title(), has_turnstile)
+    probe: _PageProbe | None = await _probe_page(page)
+    captcha_type = _guess_captcha_type(probe.title, probe.turnstile)
 
-    deadline = asyncio.get_event_loop().time() + timeout_s
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
 
     log.info("Waiting for challenge to auto-solve or show interactive element...")
     iframe_found = False
-    while asyncio.get_event_loop().time() < deadline:
-        if not await _challenge_still_present(page):
+    while loop.time() < deadline:
+        # The probe taken above is still fresh on the first pass.
+        if probe is None:
+            probe = await _probe_page(page)
+        if not probe.challenge:
             log.debug("Challenge auto-solved.")
             await asyncio.sleep(2)
             return None
 
-        # Check DOM for Turnstile iframe
-        try:
-            el = await page.query_selector(CF_IFRAME_SELECTOR)
-            if el:
-                log.debug("CF iframe found in DOM.")
-                iframe_found = True
-                break
-        except Exception:
-            pass
-
-        # Check Playwright frames API (sees cross-origin frames)
-        try:
-            for frame in page.frames:
-                if "challenges.cloudflare.com" in frame.url:
-                    log.debug("CF frame found via Playwright API: %s", frame.url)
-                    iframe_found = True
-                    break
-        except Exception:
-            pass
-        if iframe_found:
+        if _cf_iframe_present(page, probe):
+            iframe_found = True
             break
 
-        await asyncio.sleep(1)
+        # Sleep until the page changes or a CF frame shows up, then re-check.
+        await _wait_challenge_or_iframe(page, deadline - loop.time())
+        probe = None
 
     if not iframe_found:
         if not await _challenge_still_present(page):
@@ -316,7 +579,7 @@ async def _solve_challenge(
         )
 
     # Interactive challenge — invoke the solver
-    remaining = max(deadline - asyncio.get_event_loop().time(), 5)
+    remaining = max(deadline - loop.time(), 5)
     log.info("Interactive challenge detected, invoking solver (%.0fs remaining)...", remaining)
     try:
         result = await asyncio.wait_for(
@@ -337,7 +600,7 @@ async def _solve_challenge(
 async def _build_solver(page: Any) -> Any:
     """Build the configured solver for the given page."""
     if settings.captcha_solver == CaptchaSolverType.CLICK:
-        return ClickSolver(
+        return _captcha_lib().ClickSolver(
             framework=_get_framework(), page=page, max_attempts=5, attempt_delay=8,
         )
     api_solver = await _get_api_solver(page)
@@ -355,33 +618,39 @@ async def resolve_challenge(
 
     ctx_mgr = None
     page = None
+    session: Session | None = None
     session_id: str | None = None
     solver = None
     try:
         if req.session:
-            from datetime import timedelta
-
-            ttl = timedelta(minutes=req.session_ttl_minutes) if req.session_ttl_minutes else None
-            session, fresh = await sessions.get(req.session, ttl=ttl, proxy=req.proxy)
-            page = session.page
+            ttl_s = req.session_ttl_minutes * 60 if req.session_ttl_minutes else None
+            session, fresh = await sessions.get(req.session, ttl_s=ttl_s, proxy=req.proxy)
+            page = await session.acquire_page()
             session_id = session.session_id
             log.debug(
-                "Using session %s (fresh=%s, lifetime=%s)",
+                "Using session %s (fresh=%s, lifetime=%.0fs)",
                 session_id,
                 fresh,
                 session.lifetime(),
             )
         else:
-            ctx_mgr, _context, page = await launch_browser(req.proxy)
+            ctx_mgr, _context, page = await sessions.acquire_browser(req.proxy)
             log.debug("Temporary browser launched for request.")
 
-        if req.disableMedia:
+        if session is not None:
+            await _sync_media_blocking(page, session, req.disableMedia)
+        elif req.disableMedia:
             await _block_media(page)
 
         # Prepare the solver before navigation so its init scripts
-        # (unlockShadowRoot, etc.) run on the first page load.
-        solver = await _build_solver(page)
-        await solver.__aenter__()
+        # (unlockShadowRoot, etc.) run on the first page load.  Session pages
+        # keep theirs prepared, so the scripts are registered only once.
+        solver = session.solvers.get(page) if session is not None else None
+        if solver is None:
+            solver = await _build_solver(page)
+            await solver.__aenter__()
+            if session is not None:
+                session.solvers[page] = solver
 
         # Navigate
         if method == "POST" and req.postData:
@@ -390,10 +659,10 @@ async def resolve_challenge(
             await page.goto(req.url, wait_until="domcontentloaded")
         await inject_patchright_init_scripts(page)
 
-        # Apply cookies if provided, then reload
+        # Apply cookies if provided, then reload if any of them is sent to the URL
         if req.cookies:
-            for cookie in req.cookies:
-                await page.context.add_cookies([cookie])
+            await page.context.add_cookies(req.cookies)
+        if req.cookies and _cookies_affect(req.url, req.cookies):
             if method == "POST" and req.postData:
                 await _navigate_post(page, req.url, req.postData)
             else:
@@ -422,42 +691,44 @@ async def resolve_challenge(
             log.info("Challenge not detected!")
             message = "Challenge not detected!"
 
-        # Gather the response
-        if turnstile_token is None and await _detect_turnstile(page):
-            try:
-                el = await page.query_selector(TURNSTILE_SELECTORS[0])
-                if el:
-                    turnstile_token = await el.get_attribute("value")
-            except Exception:
-                pass
+        if not req.returnOnlyCookies and req.waitInSeconds and req.waitInSeconds > 0:
+            log.info("Waiting %ds before capturing response...", req.waitInSeconds)
+            await asyncio.sleep(req.waitInSeconds)
+
+        # Gather the response (independent browser round-trips, run together).
+        # A token returned by the solver makes reading it from the page moot.
+        want_html = req.returnHTML and not req.returnOnlyCookies
+        cookies, user_agent, page_token, html, raw_screenshot = await asyncio.gather(
+            _extract_cookies(page),
+            _session_user_agent(page, session),
+            _read_turnstile_token(page) if turnstile_token is None else _none(),
+            page.content() if want_html else _none(),
+            page.screenshot(type="png") if req.returnScreenshot else _none(),
+        )
 
         solution = Solution(
             url=page.url,
             status=200,
-            cookies=await _extract_cookies(page),
-            userAgent=await _get_user_agent(page),
-            turnstile_token=turnstile_token,
+            cookies=cookies,
+            userAgent=user_agent,
+            turnstile_token=turnstile_token or page_token,
         )
-
         if not req.returnOnlyCookies:
             solution.headers = {}
-
-            if req.waitInSeconds and req.waitInSeconds > 0:
-                log.info("Waiting %ds before capturing response...", req.waitInSeconds)
-                await asyncio.sleep(req.waitInSeconds)
-
-            solution.response = await page.content()
-
-        if req.returnScreenshot:
-            raw = await page.screenshot(type="png")
-            solution.screenshot = base64.b64encode(raw).decode()
+            solution.response = html
+        if raw_screenshot is not None:
+            # Multi-MB PNGs: encode off the event loop.
+            encoded = await asyncio.to_thread(base64.b64encode, raw_screenshot)
+            solution.screenshot = encoded.decode()
 
         return V1Response(status=STATUS_OK, message=message, solution=solution)
 
     finally:
-        if solver is not None:
+        if solver is not None and session is None:
             with contextlib.suppress(Exception):
                 await solver.__aexit__(None, None, None)
+        if session is not None and page is not None:
+            session.release_page(page)
         if ctx_mgr is not None:
             try:
                 await ctx_mgr.__aexit__(None, None, None)
@@ -3,6 +3,8 @@ from __future__ import annotations
 import asyncio
 import os
 import socket
+import threading
+import time
 from pathlib import Path
 
 import httpx
@@ -12,12 +14,24 @@ from aiohttp import web
 
 MOCK_PAGES = Path(__file__).parent / "mock_pages"
 
+# Read once; the handlers below serve these bytes on every hit.
+_PLAIN_HTML = (MOCK_PAGES / "plain.html").read_bytes()
+_CHALLENGE_HTML = (MOCK_PAGES / "challenge.html").read_bytes()
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
 def _free_port() -> int:
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.bind(("127.0.0.1", 0))
@@ -30,28 +44,38 @@ def _free_port() -> int:
 
 
 async def _handle_plain(request: web.Request) -> web.Response:
-    html = (MOCK_PAGES / "plain.html").read_text()
-    return web.Response(text=html, content_type="text/html")
+    return web.Response(body=_PLAIN_HTML, content_type="text/html", charset="utf-8")
 
 
 async def _handle_challenge(request: web.Request) -> web.Response:
-    html = (MOCK_PAGES / "challenge.html").read_text()
-    return web.Response(text=html, content_type="text/html")
+    return web.Response(body=_CHALLENGE_HTML, content_type="text/html", charset="utf-8")
 
 
-async def _handle_submit(request: web.Request) -> web.Response:
-    body = await request.text()
-    html = f"""<!DOCTYPE html>
+_SUBMIT_PREFIX = b"""<!DOCTYPE html>
 <html><head><title>POST Result</title></head>
-<body><pre id="post-data">{body}</pre></body></html>"""
-    return web.Response(text=html, content_type="text/html")
+<body><pre id="post-data">"""
+_SUBMIT_SUFFIX = b"</pre></body></html>"
+
+
+async def _handle_submit(request: web.Request) -> web.Response:
+    body = await request.read()
+    return web.Response(
+        body=b"".join((_SUBMIT_PREFIX, body, _SUBMIT_SUFFIX)),
+        content_type="text/html",
+        charset="utf-8",
+    )
+
+
+_SET_COOKIES = (
+    "test_cookie=cookie_value; Path=/",
+    "session_id=abc123; HttpOnly; Path=/",
+)
 
 
 async def _handle_set_cookies(request: web.Request) -> web.Response:
-    html = (MOCK_PAGES / "plain.html").read_text()
-    resp = web.Response(text=html, content_type="text/html")
-    resp.set_cookie("test_cookie", "cookie_value", path="/")
-    resp.set_cookie("session_id", "abc123", path="/", httponly=True)
+    resp = web.Response(body=_PLAIN_HTML, content_type="text/html", charset="utf-8")
+    for cookie in _SET_COOKIES:
+        resp.headers.add("Set-Cookie", cookie)
     return resp
 
 
@@ -75,24 +99,22 @@ def mock_server_url(request):
     app.router.add_get("/set-cookies", _handle_set_cookies)
     app.router.add_get("/screenshot-test", _handle_screenshot_test)
 
-    loop = asyncio.new_event_loop()
+    loop = _new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
 
+    # The loop is already running in its own thread; hand it the setup.
     runner = web.AppRunner(app)
-    loop.run_until_complete(runner.setup())
+    asyncio.run_coroutine_threadsafe(runner.setup(), loop).result()
     site = web.TCPSite(runner, "127.0.0.1", port)
-    loop.run_until_complete(site.start())
-
-    import threading
-
-    thread = threading.Thread(target=loop.run_forever, daemon=True)
-    thread.start()
+    asyncio.run_coroutine_threadsafe(site.start(), loop).result()
 
     url = f"http://127.0.0.1:{port}"
     yield url
 
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(timeout=5)
     loop.call_soon_threadsafe(loop.stop)
-    thread.join(timeout=5)
-    loop.run_until_complete(runner.cleanup())
+    thread.join(timeout=2)
     loop.close()
 
 
@@ -118,28 +140,30 @@ def playcha_url():
     )
     server = uvicorn.Server(config)
 
-    import threading
-
     thread = threading.Thread(target=server.run, daemon=True)
     thread.start()
 
-    # Wait for startup
-    import time
-
-    url = f"http://127.0.0.1:{port}"
-    for _ in range(50):
+    # Wait for the port to accept connections, then confirm once over HTTP.
+    deadline = time.monotonic() + 10
+    while True:
         try:
-            httpx.get(f"{url}/health", timeout=1)
+            socket.create_connection(("127.0.0.1", port), timeout=0.05).close()
             break
-        except Exception:
-            time.sleep(0.2)
-    else:
-        raise RuntimeError("Playcha server failed to start")
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Playcha server failed to start") from None
+            time.sleep(0.01)
+
+    url = f"http://127.0.0.1:{port}"
+    httpx.get(f"{url}/health", timeout=5).raise_for_status()
 
     yield url
 
     server.should_exit = True
-    thread.join(timeout=10)
+    thread.join(timeout=2)
+    if thread.is_alive():
+        server.force_exit = True
+        thread.join(timeout=3)
 
 
 # ---------------------------------------------------------------------------
@@ -148,7 +172,92 @@ def playcha_url():
 
 
 @pytest.fixture(scope="session")
-def client(playcha_url):
-    """Synchronous httpx client pointed at the Playcha server."""
-    with httpx.Client(base_url=playcha_url, timeout=120) as c:
+def client(playcha_url, mock_server_url):
+    """Synchronous httpx client pointed at the Playcha server.
+
+    One throwaway request is made up front so the first browser launch is
+    paid once, not by whichever test happens to run first. If it fails, the
+    browser is broken and every browser test errors at setup with its reply.
+    """
+    # uvicorn speaks HTTP/1.1 only; keep-alive already reuses one connection
+    # per worker, the limits just keep the pool bounded.
+    limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    # Tests send maxTimeout=30000, which only bounds challenge solving; leave
+    # room for a browser launch on top so a hung request fails in ~40s, not 2min.
+    timeout = httpx.Timeout(40.0, connect=2.0)
+    with httpx.Client(base_url=playcha_url, timeout=timeout, limits=limits) as c:
+        resp = c.post(
+            "/v1",
+            json={"cmd": "request.get", "url": f"{mock_server_url}/plain", "maxTimeout": 30000},
+        )
+        assert resp.is_success and resp.json()["status"] == "ok", (
+            f"Browser warm-up request failed: {resp.text}"
+        )
+        yield c
+
+
+@pytest.fixture(scope="session")
+def v1(client):
+    """POST a command to /v1; keyword arguments become request fields.
+
+    ``maxTimeout`` defaults to 30s, the budget every browser test uses.
+    """
+
+    def _v1(cmd: str, **fields) -> httpx.Response:
+        return client.post("/v1", json={"cmd": cmd, "maxTimeout": 30000, **fields})
+
+    return _v1
+
+
+@pytest.fixture(scope="session")
+def shared_session(client):
+    """A Playcha session reused by request tests that don't depend on a clean browser.
+
+    Saves a browser launch per test. Cookie and challenge tests keep using a
+    fresh temporary browser so earlier tests can't leak state into them.
+    """
+    name = "pytest-shared"
+    client.post("/v1", json={"cmd": "sessions.create", "session": name})
+    yield name
+    client.post("/v1", json={"cmd": "sessions.destroy", "session": name})
+
+
+@pytest.fixture
+def ensure_session(client):
+    """Create Playcha sessions on demand and destroy them after the test.
+
+    Returns the ``sessions.create`` response, so tests can check it too.
+    """
+    created: dict[str, None] = {}
+
+    def _ensure(name: str) -> httpx.Response:
+        created[name] = None
+        return client.post("/v1", json={"cmd": "sessions.create", "session": name})
+
+    yield _ensure
+    for name in created:
+        client.post("/v1", json={"cmd": "sessions.destroy", "session": name})
+
+
+@pytest.fixture
+async def async_client(monkeypatch):
+    """In-process async client for tests that never launch a browser.
+
+    Calls the app directly over ASGI (no uvicorn thread, no socket) inside its
+    own lifespan; the storage bound by the socket server, if any, is restored
+    afterwards.
+    """
+    from playcha import app as app_module
+
+    monkeypatch.setattr(app_module.settings, "warm_browsers", 0)
+    # Registered only so they're restored; the lifespan below rebinds both.
+    monkeypatch.setattr(app_module, "_sessions", None)
+    monkeypatch.setattr(app_module.app.state, "sessions", None, raising=False)
+
+    app = app_module.app
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://testserver") as c,
+    ):
         yield c
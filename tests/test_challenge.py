@@ -1,14 +1,10 @@
 """Tests for challenge detection and auto-resolution on a mock CF page."""
 
 
-def test_challenge_detected_and_solved(client, mock_server_url):
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "request.get",
-            "url": f"{mock_server_url}/challenge",
-            "maxTimeout": 30000,
-        },
+def test_challenge_detected_and_solved(v1, mock_server_url):
+    resp = v1(
+        "request.get",
+        url=f"{mock_server_url}/challenge",
     )
     assert resp.status_code == 200
     data = resp.json()
@@ -1,16 +1,16 @@
 """Tests for the index and health endpoints (no browser needed)."""
 
 
-def test_index(client):
-    resp = client.get("/")
+async def test_index(async_client):
+    resp = await async_client.get("/")
     assert resp.status_code == 200
     data = resp.json()
     assert data["msg"] == "Playcha is ready!"
     assert "version" in data
 
 
-def test_health(client):
-    resp = client.get("/health")
+async def test_health(async_client):
+    resp = await async_client.get("/health")
     assert resp.status_code == 200
     data = resp.json()
     assert data["status"] == "ok"
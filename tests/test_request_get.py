@@ -3,15 +3,14 @@
 import base64
 import time
 
+import pytest
 
-def test_get_plain_page(client, mock_server_url):
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "request.get",
-            "url": f"{mock_server_url}/plain",
-            "maxTimeout": 30000,
-        },
+
+def test_get_plain_page(v1, mock_server_url, shared_session):
+    resp = v1(
+        "request.get",
+        url=f"{mock_server_url}/plain",
+        session=shared_session,
     )
     assert resp.status_code == 200
     data = resp.json()
@@ -26,15 +25,11 @@ def test_get_plain_page(client, mock_server_url):
     assert len(solution["userAgent"]) > 0
 
 
-def test_get_return_only_cookies(client, mock_server_url):
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "request.get",
-            "url": f"{mock_server_url}/set-cookies",
-            "maxTimeout": 30000,
-            "returnOnlyCookies": True,
-        },
+def test_get_return_only_cookies(v1, mock_server_url):
+    resp = v1(
+        "request.get",
+        url=f"{mock_server_url}/set-cookies",
+        returnOnlyCookies=True,
     )
     assert resp.status_code == 200
     data = resp.json()
@@ -42,86 +37,77 @@ def test_get_return_only_cookies(client, mock_server_url):
 
     solution = data["solution"]
     assert "response" not in solution or solution.get("response") is None
-    assert isinstance(solution["cookies"], list)
-    assert len(solution["cookies"]) > 0
+    cookie_names = [c["name"] for c in solution["cookies"]]
+    assert "test_cookie" in cookie_names
+    assert "session_id" in cookie_names
 
+    test_cookie = next(c for c in solution["cookies"] if c["name"] == "test_cookie")
+    assert test_cookie["value"] == "cookie_value"
 
-def test_get_with_screenshot(client, mock_server_url):
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "request.get",
-            "url": f"{mock_server_url}/screenshot-test",
-            "maxTimeout": 30000,
-            "returnScreenshot": True,
-        },
+
+def test_get_without_html(v1, mock_server_url, shared_session):
+    resp = v1(
+        "request.get",
+        url=f"{mock_server_url}/plain",
+        session=shared_session,
+        returnHTML=False,
     )
     assert resp.status_code == 200
     data = resp.json()
     assert data["status"] == "ok"
 
-    screenshot = data["solution"]["screenshot"]
-    assert screenshot is not None
-    raw = base64.b64decode(screenshot)
-    # PNG files start with the PNG magic bytes
-    assert raw[:4] == b"\x89PNG"
+    solution = data["solution"]
+    assert "response" not in solution or solution.get("response") is None
+    assert solution["url"].endswith("/plain")
+    assert len(solution["userAgent"]) > 0
 
 
-def test_get_with_disable_media(client, mock_server_url):
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "request.get",
-            "url": f"{mock_server_url}/plain",
-            "maxTimeout": 30000,
-            "disableMedia": True,
-        },
+def test_get_with_screenshot(v1, mock_server_url, shared_session):
+    resp = v1(
+        "request.get",
+        url=f"{mock_server_url}/screenshot-test",
+        session=shared_session,
+        returnScreenshot=True,
     )
     assert resp.status_code == 200
     data = resp.json()
     assert data["status"] == "ok"
-    assert "Hello from Playcha test server" in data["solution"]["response"]
 
+    screenshot = data["solution"]["screenshot"]
+    assert screenshot is not None
+    # PNG files start with the PNG magic bytes; 8 base64 chars decode to 6 bytes
+    assert base64.b64decode(screenshot[:8])[:4] == b"\x89PNG"
 
-def test_get_set_cookies(client, mock_server_url):
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "request.get",
-            "url": f"{mock_server_url}/set-cookies",
-            "maxTimeout": 30000,
-        },
+
+def test_get_with_disable_media(v1, mock_server_url, shared_session):
+    resp = v1(
+        "request.get",
+        url=f"{mock_server_url}/plain",
+        session=shared_session,
+        disableMedia=True,
     )
     assert resp.status_code == 200
     data = resp.json()
     assert data["status"] == "ok"
-
-    cookie_names = [c["name"] for c in data["solution"]["cookies"]]
-    assert "test_cookie" in cookie_names
-    assert "session_id" in cookie_names
-
-    test_cookie = next(c for c in data["solution"]["cookies"] if c["name"] == "test_cookie")
-    assert test_cookie["value"] == "cookie_value"
+    assert "Hello from Playcha test server" in data["solution"]["response"]
 
 
-def test_get_wait_in_seconds(client, mock_server_url):
+@pytest.mark.slow
+def test_get_wait_in_seconds(v1, mock_server_url, shared_session):
     start = time.monotonic()
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "request.get",
-            "url": f"{mock_server_url}/plain",
-            "maxTimeout": 30000,
-            "waitInSeconds": 2,
-        },
+    resp = v1(
+        "request.get",
+        url=f"{mock_server_url}/plain",
+        session=shared_session,
+        waitInSeconds=2,
     )
     elapsed = time.monotonic() - start
     assert resp.status_code == 200
     assert elapsed >= 2.0
 
 
-def test_get_missing_url(client):
-    resp = client.post(
+async def test_get_missing_url(async_client):
+    resp = await async_client.post(
         "/v1",
         json={
             "cmd": "request.get",
@@ -134,12 +120,12 @@ def test_get_missing_url(client):
     assert "url" in data["message"].lower()
 
 
-def test_get_with_post_data_rejected(client, mock_server_url):
-    resp = client.post(
+async def test_get_with_post_data_rejected(async_client):
+    resp = await async_client.post(
         "/v1",
         json={
             "cmd": "request.get",
-            "url": f"{mock_server_url}/plain",
+            "url": "http://127.0.0.1/plain",
             "postData": "foo=bar",
             "maxTimeout": 30000,
         },
@@ -1,15 +1,12 @@
 """Tests for the request.post command with a real Camoufox browser."""
 
 
-def test_post_echoes_body(client, mock_server_url):
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "request.post",
-            "url": f"{mock_server_url}/submit",
-            "postData": "username=testuser&password=secret",
-            "maxTimeout": 30000,
-        },
+def test_post_echoes_body(v1, mock_server_url, shared_session):
+    resp = v1(
+        "request.post",
+        url=f"{mock_server_url}/submit",
+        postData="username=testuser&password=secret",
+        session=shared_session,
     )
     assert resp.status_code == 200
     data = resp.json()
@@ -20,12 +17,12 @@ def test_post_echoes_body(client, mock_server_url):
     assert "password=secret" in html
 
 
-def test_post_missing_post_data(client, mock_server_url):
-    resp = client.post(
+async def test_post_missing_post_data(async_client):
+    resp = await async_client.post(
         "/v1",
         json={
             "cmd": "request.post",
-            "url": f"{mock_server_url}/submit",
+            "url": "http://127.0.0.1/submit",
             "maxTimeout": 30000,
         },
     )
@@ -35,8 +32,8 @@ def test_post_missing_post_data(client, mock_server_url):
     assert "postData" in data["message"]
 
 
-def test_post_missing_url(client):
-    resp = client.post(
+async def test_post_missing_url(async_client):
+    resp = await async_client.post(
         "/v1",
         json={
             "cmd": "request.post",
@@ -1,14 +1,10 @@
 """Tests for session lifecycle: create, list, destroy, and request with session."""
 
+import pytest
 
-def test_session_create(client):
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.create",
-            "session": "test-session-1",
-        },
-    )
+
+def test_session_create(ensure_session):
+    resp = ensure_session("test-session-1")
     assert resp.status_code == 200
     data = resp.json()
     assert data["status"] == "ok"
@@ -16,66 +12,45 @@ def test_session_create(client):
     assert data["session"] == "test-session-1"
 
 
-def test_session_create_duplicate(client):
-    # Ensure it exists first
-    client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.create",
-            "session": "test-session-dup",
-        },
-    )
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.create",
-            "session": "test-session-dup",
-        },
-    )
+def test_session_create_duplicate(ensure_session):
+    ensure_session("test-session-dup")
+    resp = ensure_session("test-session-dup")
     assert resp.status_code == 200
     data = resp.json()
     assert data["status"] == "ok"
     assert data["message"] == "Session already exists."
 
 
-def test_session_list_includes_created(client):
-    client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.create",
-            "session": "test-session-list",
-        },
-    )
-    resp = client.post("/v1", json={"cmd": "sessions.list"})
+def test_session_destroy(v1, ensure_session):
+    ensure_session("test-session-destroy")
+    resp = v1("sessions.destroy", session="test-session-destroy")
     assert resp.status_code == 200
     data = resp.json()
     assert data["status"] == "ok"
-    assert "test-session-list" in data["sessions"]
+    assert data["message"] == "The session has been removed."
 
 
-def test_session_destroy(client):
-    client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.create",
-            "session": "test-session-destroy",
-        },
-    )
-    resp = client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.destroy",
-            "session": "test-session-destroy",
-        },
-    )
+# (session id, destroyed before listing, whether sessions.list should include it)
+LIST_SCENARIOS = [
+    pytest.param("test-session-list", False, True, id="includes-created"),
+    pytest.param("test-session-gone", True, False, id="excludes-destroyed"),
+]
+
+
+@pytest.mark.parametrize("session,destroy,listed", LIST_SCENARIOS)
+def test_session_list(v1, ensure_session, session, destroy, listed):
+    ensure_session(session)
+    if destroy:
+        v1("sessions.destroy", session=session)
+    resp = v1("sessions.list")
     assert resp.status_code == 200
     data = resp.json()
     assert data["status"] == "ok"
-    assert data["message"] == "The session has been removed."
+    assert (session in data["sessions"]) is listed
 
 
-def test_session_destroy_nonexistent(client):
-    resp = client.post(
+async def test_session_destroy_nonexistent(async_client):
+    resp = await async_client.post(
         "/v1",
         json={
             "cmd": "sessions.destroy",
@@ -88,57 +63,23 @@ def test_session_destroy_nonexistent(client):
     assert "doesn't exist" in data["message"]
 
 
-def test_session_list_after_destroy(client):
-    client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.create",
-            "session": "test-session-gone",
-        },
-    )
-    client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.destroy",
-            "session": "test-session-gone",
-        },
-    )
-    resp = client.post("/v1", json={"cmd": "sessions.list"})
-    data = resp.json()
-    assert "test-session-gone" not in data["sessions"]
-
+def test_request_with_session(v1, mock_server_url, ensure_session):
+    ensure_session("test-session-req")
 
-def test_request_with_session(client, mock_server_url):
-    client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.create",
-            "session": "test-session-req",
-        },
-    )
-
-    resp1 = client.post(
-        "/v1",
-        json={
-            "cmd": "request.get",
-            "url": f"{mock_server_url}/plain",
-            "session": "test-session-req",
-            "maxTimeout": 30000,
-        },
+    resp1 = v1(
+        "request.get",
+        url=f"{mock_server_url}/plain",
+        session="test-session-req",
     )
     assert resp1.status_code == 200
     data1 = resp1.json()
     assert data1["status"] == "ok"
     ua1 = data1["solution"]["userAgent"]
 
-    resp2 = client.post(
-        "/v1",
-        json={
-            "cmd": "request.get",
-            "url": f"{mock_server_url}/plain",
-            "session": "test-session-req",
-            "maxTimeout": 30000,
-        },
+    resp2 = v1(
+        "request.get",
+        url=f"{mock_server_url}/plain",
+        session="test-session-req",
     )
     assert resp2.status_code == 200
     data2 = resp2.json()
@@ -146,12 +87,3 @@ def test_request_with_session(client, mock_server_url):
 
     # Same session should produce the same user agent
     assert ua1 == ua2
-
-    # Clean up
-    client.post(
-        "/v1",
-        json={
-            "cmd": "sessions.destroy",
-            "session": "test-session-req",
-        },
-    )